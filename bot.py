@@ -125,7 +125,11 @@ async def on_shutdown(bot: Bot):
             logger.info("Cleaned up temporary files")
     except Exception as e:
         logger.warning(f"Failed to clean up temporary files: {e}")
-    
+
+    # Закрываем общую HTTP-сессию сервисов
+    from utils.http import close_session
+    await close_session()
+
     await bot.session.close()
     logger.info("Bot stopped")
 
@@ -4,12 +4,13 @@ from aiogram.fsm.context import FSMContext
 import logging
 import os
 import asyncio
+import uuid
 from typing import Dict, Any
 
 from config import DOWNLOADS_DIR, STATUS_DOWNLOADING, STATUS_UPLOADING, STATUS_COMPLETE, MAX_FILE_SIZE_MB
 from utils.formatters import format_download_status, format_error_message, format_audio_metadata, clean_filename
 from utils.keyboards import get_error_keyboard
-from services.youtube_service import YouTubeService
+from services.youtube_service import get_youtube_service
 from services.soundcloud_service import SoundCloudService
 from handlers.search import search_cache
 
@@ -156,7 +157,8 @@ async def download_and_send_track(message, source: str, track_info: Dict[str, An
         title = track_info.get('title', 'Unknown Track')
         artist = track_info.get('artist', '')
         filename = clean_filename(f"{artist} - {title}" if artist else title)
-        file_path = os.path.join(DOWNLOADS_DIR, f"{filename}.mp3")
+        # Уникальный суффикс: одновременные загрузки одного трека не должны делить (и удалять) один файл
+        file_path = os.path.join(DOWNLOADS_DIR, f"{filename}.{uuid.uuid4().hex[:8]}.mp3")
         
         # Обновляем статус
         active_downloads[download_key]['status'] = 'downloading'
@@ -208,8 +210,8 @@ async def download_and_send_track(message, source: str, track_info: Dict[str, An
         # Подготавливаем метаданные
         metadata = format_audio_metadata(track_info)
         
-        # Отправляем аудио файл
-        audio_file = FSInputFile(file_path)
+        # Отправляем аудио файл (пользователь видит имя без служебного суффикса)
+        audio_file = FSInputFile(file_path, filename=f"{filename}.mp3")
         await message.answer_audio(
             audio=audio_file,
             title=metadata['title'],
@@ -249,7 +251,7 @@ async def download_and_send_track(message, source: str, track_info: Dict[str, An
 def get_download_service(source: str):
     """Возвращает сервис для скачивания из указанного источника"""
     if source in ["youtube", "youtube_music"]:
-        return YouTubeService()
+        return get_youtube_service()
     elif source == "soundcloud":
         return SoundCloudService()
     elif source == "vk_music":
@@ -6,9 +6,9 @@ import logging
 from typing import Dict, Any
 
 from config import SOURCES, STATUS_SEARCHING, MAX_RESULTS_PER_PAGE
-from utils.keyboards import get_source_selection_keyboard, get_search_results_keyboard, get_error_keyboard
+from utils.keyboards import get_source_selection_keyboard, get_search_results_keyboard, get_error_keyboard, resolve_query_token
 from utils.formatters import format_search_results_message, format_error_message
-from services.youtube_service import YouTubeService
+from services.youtube_service import get_youtube_service
 from services.soundcloud_service import SoundCloudService
 
 router = Router()
@@ -124,7 +124,8 @@ async def handle_page_navigation(callback: CallbackQuery):
 
         source = parts[1]
         page = int(parts[2])
-        query = parts[3]
+        # Длинные запросы приходят в виде токена
+        query = resolve_query_token(parts[3])
 
         cache_key = f"{callback.from_user.id}_{source}_{query}"
         
@@ -151,10 +152,10 @@ async def perform_search(source: str, query: str):
     """
     try:
         if source == "youtube":
-            service = YouTubeService()
+            service = get_youtube_service()
             return await service.search(query), None
         elif source == "youtube_music":
-            service = YouTubeService()
+            service = get_youtube_service()
             return await service.search_music(query), None
         elif source == "soundcloud":
             service = SoundCloudService()
@@ -119,7 +119,7 @@ async def callback_help(callback: CallbackQuery):
 
 @router.callback_query(F.data == "noop")
 async def callback_noop(callback: CallbackQuery):
-    """Обработчик для кнопок без действия (например, индикатор страницы)"""
+    """Обработчик для кнопок без действия (индикатор страницы в старых сообщениях)"""
     await callback.answer()
 
 @router.message(Command("upload_cookies", "auth_youtube", "cookies"))
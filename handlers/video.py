@@ -9,7 +9,7 @@ import re
 from typing import Dict, Any
 
 from config import DOWNLOADS_DIR, MAX_FILE_SIZE_MB
-from services.youtube_video_service import YouTubeVideoService, VIDEO_QUALITIES
+from services.youtube_video_service import get_video_service, VIDEO_QUALITIES
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -53,8 +53,7 @@ class VideoURLFilter(Filter):
     async def __call__(self, message: Message) -> bool:
         if not message.text:
             return False
-        service = YouTubeVideoService()
-        return service.is_supported_video_url(message.text)
+        return get_video_service().is_supported_video_url(message.text)
 
 
 @router.message(VideoURLFilter())
@@ -63,7 +62,7 @@ async def handle_video_url(message: Message):
     url = message.text.strip()
     user_id = message.from_user.id
 
-    service = YouTubeVideoService()
+    service = get_video_service()
     platform = service.detect_platform(url)
     platform_name = PLATFORM_NAMES.get(platform, 'Video')
 
@@ -248,7 +247,7 @@ async def handle_video_retry(callback: CallbackQuery):
     await callback.answer("🔄 Повторяю...")
     await callback.message.edit_text("🔍 Получаю информацию о видео...")
 
-    service = YouTubeVideoService()
+    service = get_video_service()
     platform = service.detect_platform(url)
     user_id = callback.from_user.id
 
@@ -421,7 +420,7 @@ async def download_and_send_video(message, video_info: Dict[str, Any], quality:
             )
 
     try:
-        service = YouTubeVideoService()
+        service = get_video_service()
 
         # Показываем статус "записывает видео..."
         await message.bot.send_chat_action(
@@ -1,15 +1,22 @@
 import asyncio
 import logging
+import os
 from typing import List, Dict, Any, Optional, Tuple
+import aiofiles
 from vkpymusic import Service
 
-from config import VK_TOKEN, VK_LOGIN, VK_PASSWORD
+from config import VK_TOKEN
+from utils.http import gather_limited, get_session
+from utils.tracks import dedup_tracks
 
 logger = logging.getLogger(__name__)
 
 # Kate Mobile User-Agent для VK API
 KATE_MOBILE_USER_AGENT = 'KateMobileAndroid/56 lite-460 (Android 4.4.2; SDK 19; x86; unknown Android SDK built for x86; en)'
 
+# Размер блока при скачивании треков (128 KiB)
+DOWNLOAD_CHUNK_SIZE = 128 * 1024
+
 class VKMusicService:
     def __init__(self):
         """Инициализация VK Music через vkpymusic с токеном"""
@@ -93,24 +100,7 @@ class VKMusicService:
             songs = self.service.search_songs_by_text(query, max_results)
             logger.info(f"vkpymusic returned {len(songs)} songs")
 
-            tracks = []
-            seen_ids = set()  # Отслеживаем уникальные ID треков
-
-            for i, song in enumerate(songs):
-                try:
-                    track = self._format_vk_track(song, i)
-                    if track:
-                        track_id = track.get('id')
-                        # Пропускаем дубликаты
-                        if track_id not in seen_ids:
-                            seen_ids.add(track_id)
-                            tracks.append(track)
-                            logger.debug(f"Formatted track {i}: {track.get('artist')} - {track.get('title')}")
-                        else:
-                            logger.debug(f"Skipping duplicate track {i}: {track_id}")
-                except Exception as track_error:
-                    logger.warning(f"Failed to format track {i}: {track_error}", exc_info=True)
-                    continue
+            tracks = dedup_tracks(self._format_vk_track(song, i) for i, song in enumerate(songs))
 
             logger.info(f"Successfully formatted {len(tracks)} unique tracks (filtered from {len(songs)} total)")
             return tracks
@@ -132,23 +122,25 @@ class VKMusicService:
         """
         try:
             # Проверяем наличие URL
-            if not song.url:
+            url = song.url
+            if not url:
                 logger.warning(f"Track {index} has no URL, skipping")
                 return None
 
             # Создаем уникальный ID из owner_id и track_id
-            unique_id = f"{song.owner_id}_{song.track_id}"
+            owner_id = song.owner_id
+            track_id = song.track_id
 
             return {
-                'id': unique_id,
+                'id': f"{owner_id}_{track_id}",
                 'title': song.title or 'Unknown Title',
                 'artist': song.artist or 'Unknown Artist',
                 'duration': song.duration or 0,
                 'quality': 'high',
                 'source': 'vk_music',
-                'url': song.url,
-                'owner_id': song.owner_id,
-                'track_id': song.track_id
+                'url': url,
+                'owner_id': owner_id,
+                'track_id': track_id
             }
 
         except Exception as e:
@@ -172,21 +164,33 @@ class VKMusicService:
                 logger.error("No URL provided for VK download")
                 return False
 
-            # Скачиваем файл через aiohttp
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(track_url, timeout=aiohttp.ClientTimeout(total=300)) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to download: HTTP {response.status}")
-                        return False
-
-                    # Скачиваем и записываем файл
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-
-                    logger.info(f"Successfully downloaded VK track to {output_path}")
-                    return True
+            # Скачиваем файл через общую aiohttp-сессию
+            async with get_session().get(track_url) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to download: HTTP {response.status}")
+                    return False
+
+                # VK отдает страницу ошибки/логина с HTTP 200 — не пишем ее на диск
+                content_type = response.headers.get('Content-Type', '')
+                if content_type.startswith('text/'):
+                    logger.error(f"VK returned {content_type} instead of audio for {track_url}")
+                    return False
+
+                # Скачиваем и записываем файл
+                written = 0
+                async with aiofiles.open(output_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+                        written += len(chunk)
+
+                expected = response.content_length
+                if expected is not None and written != expected:
+                    logger.error(f"Incomplete VK download: got {written} of {expected} bytes")
+                    os.remove(output_path)
+                    return False
+
+                logger.info(f"Successfully downloaded VK track to {output_path}")
+                return True
 
         except asyncio.TimeoutError:
             logger.error(f"Download timeout for {track_url}")
@@ -195,6 +199,19 @@ class VKMusicService:
             logger.error(f"VK download error: {e}", exc_info=True)
             return False
 
+    async def download_many(self, items: List[Tuple[Dict[str, Any], str]], concurrency: int = 4) -> List[bool]:
+        """
+        Скачивает несколько треков параллельно
+
+        Args:
+            items: Список пар (информация о треке, путь для сохранения)
+            concurrency: Максимальное число одновременных загрузок
+
+        Returns:
+            Список результатов download() в порядке items
+        """
+        return await gather_limited((self.download(track_info, path) for track_info, path in items), concurrency)
+
     async def close(self):
         """Очистка ресурсов"""
         # vkpymusic не требует явного закрытия соединений
@@ -1,35 +1,64 @@
 import asyncio
 import logging
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 
 from config import YANDEX_MUSIC_TOKEN
+from utils.cache import TTLCache
+from utils.http import gather_limited
+from utils.tracks import dedup_tracks
 
 logger = logging.getLogger(__name__)
 
+# Отдельный пул потоков для синхронного yandex-music (не занимает default executor)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='yandex-music')
+
+# Кэш download_info по ID трека (ссылки Яндекса со временем протухают)
+_download_info_cache = TTLCache(maxsize=256, ttl=30 * 60)
+
+# Кэш результатов поиска по (запрос, max_results) — повторные запросы не ходят в API
+_search_cache = TTLCache(maxsize=256, ttl=60)
+
+# Клиент создается лениво при первом запросе и общий для всех экземпляров сервиса
+_client = None
+_client_lock = threading.Lock()
+
 
 class YandexMusicService:
     def __init__(self):
-        """Инициализация Yandex Music API"""
+        """Инициализация Yandex Music API (клиент создается при первом запросе)"""
         self.client = None
         self.is_authenticated = False
         self.auth_error_message = None
 
-        try:
-            if YANDEX_MUSIC_TOKEN:
-                from yandex_music import Client
-                logger.info("Initializing Yandex Music with token")
-                # Инициализируем клиент с токеном
-                self.client = Client(YANDEX_MUSIC_TOKEN).init()
-                self.is_authenticated = True
-                logger.info("Yandex Music service initialized successfully")
-            else:
-                logger.error("YANDEX_MUSIC_TOKEN not set in environment")
-                self.auth_error_message = "YANDEX_MUSIC_TOKEN not configured"
+        if YANDEX_MUSIC_TOKEN:
+            self.is_authenticated = True
+        else:
+            logger.error("YANDEX_MUSIC_TOKEN not set in environment")
+            self.auth_error_message = "YANDEX_MUSIC_TOKEN not configured"
+
+    def _ensure_client(self):
+        """Возвращает клиент yandex-music, инициализируя его при первом обращении (вызывается в executor)"""
+        global _client
+        if self.client is not None:
+            return self.client
 
+        try:
+            with _client_lock:
+                if _client is None:
+                    from yandex_music import Client
+                    logger.info("Initializing Yandex Music with token")
+                    _client = Client(YANDEX_MUSIC_TOKEN).init()
+                    logger.info("Yandex Music service initialized successfully")
         except Exception as e:
             logger.error(f"Yandex Music initialization error: {e}", exc_info=True)
+            self.is_authenticated = False
             self.auth_error_message = f"Initialization error: {e}"
+            raise
+
+        self.client = _client
+        return self.client
 
     async def search(self, query: str, max_results: int = 50) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
@@ -47,15 +76,26 @@ class YandexMusicService:
             logger.error(f"Yandex Music не авторизован: {self.auth_error_message}")
             return [], error_msg
 
+        cache_key = (query, max_results)
+        cached = _search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Yandex Music search for '{query}' served from cache ({len(cached)} results)")
+            # Копии словарей: обработчики дописывают в треки служебные поля
+            return [dict(track) for track in cached], None
+
         try:
             logger.info(f"Searching Yandex Music for: {query}")
 
             # Выполняем поиск в отдельном потоке (yandex-music синхронный)
-            tracks = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self._search_sync(query, max_results)
+            tracks = await asyncio.get_running_loop().run_in_executor(
+                _executor,
+                self._search_sync, query, max_results
             )
 
+            # Ошибка ленивой инициализации клиента всплывает только здесь
+            if not self.is_authenticated:
+                return [], f"Auth: {self.auth_error_message}"
+
             result_count = len(tracks)
             logger.info(f"Yandex Music search for '{query}' returned {result_count} results")
 
@@ -63,12 +103,16 @@ class YandexMusicService:
                 error_details = f"Query: '{query}'\nMax results: {max_results}\nReturned: 0 tracks"
                 return [], error_details
 
+            _search_cache.set(cache_key, [dict(track) for track in tracks])
             return tracks, None
 
         except Exception as e:
-            import traceback
-            error_msg = f"Error: {type(e).__name__}\nMessage: {str(e)}\nQuery: '{query}'\nTraceback:\n{traceback.format_exc()}"
             logger.error(f"Ошибка поиска Yandex Music: {e}", exc_info=True)
+            error_msg = f"Error: {type(e).__name__}\nMessage: {str(e)}\nQuery: '{query}'"
+            # Трейсбек уже попал в лог через exc_info, в сообщение добавляем его только в debug
+            if logger.isEnabledFor(logging.DEBUG):
+                import traceback
+                error_msg += f"\nTraceback:\n{traceback.format_exc()}"
             return [], error_msg
 
     def _search_sync(self, query: str, max_results: int) -> List[Dict[str, Any]]:
@@ -77,7 +121,7 @@ class YandexMusicService:
             logger.debug(f"Calling yandex_music search with query='{query}'")
 
             # Поиск через yandex-music
-            search_result = self.client.search(query, type_='track')
+            search_result = self._ensure_client().search(query, type_='track')
 
             if not search_result or not search_result.tracks:
                 logger.info("Yandex Music search returned no tracks")
@@ -86,23 +130,7 @@ class YandexMusicService:
             tracks_result = search_result.tracks.results
             logger.info(f"Yandex Music returned {len(tracks_result)} tracks")
 
-            tracks = []
-            seen_ids = set()
-
-            for i, track in enumerate(tracks_result[:max_results]):
-                try:
-                    formatted = self._format_yandex_track(track, i)
-                    if formatted:
-                        track_id = formatted.get('id')
-                        if track_id not in seen_ids:
-                            seen_ids.add(track_id)
-                            tracks.append(formatted)
-                            logger.debug(f"Formatted track {i}: {formatted.get('artist')} - {formatted.get('title')}")
-                        else:
-                            logger.debug(f"Skipping duplicate track {i}: {track_id}")
-                except Exception as track_error:
-                    logger.warning(f"Failed to format track {i}: {track_error}", exc_info=True)
-                    continue
+            tracks = dedup_tracks(self._format_yandex_track(track, i) for i, track in enumerate(tracks_result[:max_results]))
 
             logger.info(f"Successfully formatted {len(tracks)} unique tracks")
             return tracks
@@ -127,18 +155,20 @@ class YandexMusicService:
             track_id = str(track.id)
 
             # Получаем исполнителей
-            artists = ', '.join([artist.name for artist in track.artists]) if track.artists else 'Unknown Artist'
+            artists = ', '.join(artist.name for artist in track.artists) if track.artists else 'Unknown Artist'
 
             # Получаем длительность в секундах (в API это миллисекунды)
             duration = track.duration_ms // 1000 if track.duration_ms else 0
 
+            album0 = track.albums[0] if track.albums else None
+
             # Получаем обложку альбома
             thumbnail = None
-            if track.albums and track.albums[0].cover_uri:
-                thumbnail = f"https://{track.albums[0].cover_uri.replace('%%', '400x400')}"
+            if album0 and album0.cover_uri:
+                thumbnail = f"https://{album0.cover_uri.replace('%%', '400x400')}"
 
             # Получаем название альбома
-            album = track.albums[0].title if track.albums else None
+            album = album0.title if album0 else None
 
             return {
                 'id': track_id,
@@ -180,9 +210,10 @@ class YandexMusicService:
             logger.info(f"Starting Yandex Music download: {title} (ID: {track_id})")
 
             # Скачиваем в отдельном потоке
-            success = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self._download_sync(track_id, output_path)
+            # Объект трека из поиска позволяет не запрашивать его повторно
+            success = await asyncio.get_running_loop().run_in_executor(
+                _executor,
+                self._download_sync, track_id, output_path, track_info.get('_track_obj')
             )
 
             return success
@@ -191,33 +222,49 @@ class YandexMusicService:
             logger.error(f"Yandex Music download error: {e}", exc_info=True)
             return False
 
-    def _download_sync(self, track_id: str, output_path: str) -> bool:
+    async def download_many(self, items: List[Tuple[Dict[str, Any], str]], concurrency: int = 4) -> List[bool]:
+        """
+        Скачивает несколько треков параллельно
+
+        Args:
+            items: Список пар (информация о треке, путь для сохранения)
+            concurrency: Максимальное число одновременных загрузок
+
+        Returns:
+            Список результатов download() в порядке items
+        """
+        return await gather_limited((self.download(track_info, path) for track_info, path in items), concurrency)
+
+    def _download_sync(self, track_id: str, output_path: str, track=None) -> bool:
         """Синхронное скачивание (вызывается через executor)"""
         try:
-            # Получаем трек по ID
-            tracks = self.client.tracks([track_id])
-            if not tracks:
-                logger.error(f"Track not found: {track_id}")
-                return False
+            # Получаем информацию о скачивании (из кэша, если есть)
+            download_info = _download_info_cache.get(track_id)
+            if download_info is None:
+                if track is None:
+                    # Получаем трек по ID
+                    tracks = self._ensure_client().tracks([track_id])
+                    if not tracks:
+                        logger.error(f"Track not found: {track_id}")
+                        return False
+
+                    track = tracks[0]
+
+                download_info = track.get_download_info()
+                if download_info:
+                    _download_info_cache.set(track_id, download_info)
 
-            track = tracks[0]
-
-            # Получаем информацию о скачивании
-            download_info = track.get_download_info()
             if not download_info:
                 logger.error(f"No download info for track: {track_id}")
                 return False
 
-            # Выбираем лучшее качество (mp3 320kbps если доступно)
-            best_quality = None
-            for info in download_info:
-                if info.codec == 'mp3':
-                    if best_quality is None or info.bitrate_in_kbps > best_quality.bitrate_in_kbps:
-                        best_quality = info
-
-            # Если mp3 не найден, берем любой формат
-            if not best_quality and download_info:
-                best_quality = download_info[0]
+            # Выбираем лучшее качество (mp3 320kbps если доступно),
+            # если mp3 не найден, берем любой формат
+            best_quality = max(
+                (info for info in download_info if info.codec == 'mp3'),
+                key=lambda info: info.bitrate_in_kbps,
+                default=download_info[0]
+            )
 
             if not best_quality:
                 logger.error(f"No suitable download format for track: {track_id}")
@@ -225,39 +272,21 @@ class YandexMusicService:
 
             logger.info(f"Downloading track with codec={best_quality.codec}, bitrate={best_quality.bitrate_in_kbps}kbps")
 
-            # Скачиваем файл
-            # Убираем расширение .mp3 если оно есть, т.к. download() добавит своё
-            base_path = output_path
-            if output_path.endswith('.mp3'):
-                base_path = output_path[:-4]
-
-            best_quality.download(base_path)
-
-            # Проверяем, что файл создан (может быть с другим расширением)
-            if os.path.exists(base_path):
-                # Переименуем в .mp3 если нужно
-                if not output_path.endswith('.mp3'):
-                    os.rename(base_path, output_path)
-                else:
-                    os.rename(base_path, output_path)
-                logger.info(f"Successfully downloaded Yandex Music track to {output_path}")
-                return True
-            elif os.path.exists(output_path):
-                logger.info(f"Successfully downloaded Yandex Music track to {output_path}")
-                return True
-            else:
-                # Проверяем с различными расширениями
-                for ext in ['.mp3', '.m4a', '.aac']:
-                    check_path = base_path + ext
-                    if os.path.exists(check_path):
-                        if check_path != output_path:
-                            os.rename(check_path, output_path)
-                        logger.info(f"Successfully downloaded Yandex Music track to {output_path}")
-                        return True
-
-                logger.error(f"Downloaded file not found at expected location")
+            # download_info мог прийти из кэша — получаем свежую прямую ссылку
+            best_quality.get_direct_link()
+
+            # Скачиваем в память и записываем сразу по нужному пути
+            data = best_quality.download_bytes()
+            if not data:
+                logger.error(f"Empty response for Yandex Music track: {track_id}")
                 return False
 
+            with open(output_path, 'wb') as f:
+                f.write(data)
+
+            logger.info(f"Successfully downloaded Yandex Music track to {output_path}")
+            return True
+
         except Exception as e:
             logger.error(f"Yandex _download_sync error: {e}", exc_info=True)
             return False
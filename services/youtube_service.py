@@ -1,113 +1,345 @@
 import asyncio
+import functools
 import logging
 import os
 import re
-from typing import List, Dict, Any, Optional
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 import yt_dlp
 from ytmusicapi import YTMusic
 
 from config import YOUTUBE_API_KEY, AUDIO_FORMAT, AUDIO_QUALITY
+from utils.cache import TTLCache
+from utils.circuit_breaker import CircuitBreaker
 from utils.formatters import format_duration
+from utils.http import gather_limited
+from utils.tracks import dedup_tracks
 
 logger = logging.getLogger(__name__)
 
+# Файл cookies YouTube в корне проекта (может появиться позже через /cookies)
+_COOKIES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'youtube_cookies.txt')
+
+# Отдельный пул потоков для yt-dlp и ytmusicapi (не занимает default executor)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ytdlp')
+
+# Настройки yt-dlp для поиска (не меняются между вызовами)
+_SEARCH_YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': True,
+    'default_search': 'ytsearch50:',
+}
+
+# YoutubeDL не потокобезопасен, поэтому у каждого потока _executor свой экземпляр
+_thread_local = threading.local()
+
+
+def _get_search_ydl() -> yt_dlp.YoutubeDL:
+    """Возвращает экземпляр YoutubeDL для поиска, созданный для текущего потока"""
+    ydl = getattr(_thread_local, 'search_ydl', None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(_SEARCH_YDL_OPTS)
+        _thread_local.search_ydl = ydl
+    return ydl
+
+# Паттерны для извлечения исполнителя из названия видео (проверяются по порядку)
+_ARTIST_PATTERNS = (
+    re.compile(r'^([^-]+)\s*-\s*(.+)$'),   # "Artist - Title"
+    re.compile(r'^([^–]+)\s*–\s*(.+)$'),   # "Artist – Title" (em dash)
+    re.compile(r'^([^|]+)\s*\|\s*(.+)$'),  # "Artist | Title"
+    re.compile(r'^([^:]+):\s*(.+)$'),      # "Artist: Title"
+)
+
+# Слова, при наличии которых найденная часть не считается исполнителем
+_ARTIST_BANWORDS = frozenset(('official', 'video', 'lyrics', 'audio'))
+
+# Общий размыкатель для запросов к YouTube: при 429/капче перестаем ходить в сеть
+_breaker = CircuitBreaker('youtube', max_failures=5, reset_after=300)
+
+# Признаки того, что YouTube ограничивает запросы или не отвечает
+_RATE_LIMIT_MARKERS = ('429', 'too many requests', '503', 'not a bot', 'timed out')
+
+
+def _record_youtube_error(error: Exception):
+    """Учитывает ошибку запроса к YouTube в размыкателе"""
+    message = str(error).lower()
+    if any(marker in message for marker in _RATE_LIMIT_MARKERS):
+        _breaker.record_failure()
+    else:
+        # YouTube ответил — ошибка не связана с его доступностью
+        _breaker.record_success()
+
+# Перекодирование идет отдельными процессами ffmpeg, не больше одного на ядро
+_ffmpeg_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+# nice понижает приоритет ffmpeg, чтобы перекодирование не мешало event loop бота
+_NICE_PATH = shutil.which('nice')
+
+
+# Кодеки ffmpeg для AUDIO_FORMAT из config
+_FFMPEG_AUDIO_CODECS = {
+    'mp3': 'libmp3lame',
+    'aac': 'aac',
+    'm4a': 'aac',
+    'opus': 'libopus',
+    'vorbis': 'libvorbis',
+    'ogg': 'libvorbis',
+    'flac': 'flac',
+    'wav': 'pcm_s16le',
+}
+
+
+async def _transcode_audio(src_path: str, output_path: str) -> bool:
+    """Перекодирует скачанную дорожку в AUDIO_FORMAT внешним ffmpeg и удаляет исходный файл"""
+    codec = _FFMPEG_AUDIO_CODECS.get(AUDIO_FORMAT, 'libmp3lame')
+    cmd = [
+        'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error', '-y',
+        '-i', src_path, '-vn', '-codec:a', codec, '-b:a', f'{AUDIO_QUALITY}k',
+        output_path,
+    ]
+    if _NICE_PATH:
+        cmd = [_NICE_PATH, '-n', '10'] + cmd
+
+    try:
+        async with _ffmpeg_semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                process.kill()
+                raise
+    finally:
+        if os.path.exists(src_path):
+            os.remove(src_path)
+
+    if process.returncode != 0:
+        logger.error(f"❌ ffmpeg failed for {src_path}: {stderr.decode(errors='replace').strip()}")
+        return False
+    return True
+
+# Кэш результатов поиска: ключ (запрос, max_results, метод) -> список треков
+_search_cache = TTLCache(maxsize=1024, ttl=86400)
+
+# Поиски, которые выполняются прямо сейчас (одинаковые запросы ждут один и тот же)
+_inflight_searches: Dict[tuple, asyncio.Future] = {}
+
+# Загрузки, которые выполняются прямо сейчас: video_id -> future с путем к файлу (или None)
+_inflight_downloads: Dict[str, asyncio.Future] = {}
+
+
+class _UncacheableResult(Exception):
+    """Результат поиска, который нельзя кэшировать (например, fallback на другой источник)"""
+
+    def __init__(self, tracks: List[Dict[str, Any]]):
+        super().__init__()
+        self.tracks = tracks
+
+
+async def _cached_search(key: tuple, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """Возвращает результаты поиска из кэша или выполняет fetch(), объединяя одинаковые запросы"""
+    tracks = _search_cache.get(key)
+    if tracks is None:
+        task = _inflight_searches.get(key)
+        if task is None:
+            async def _fetch_and_store():
+                try:
+                    result = await fetch()
+                except _UncacheableResult as e:
+                    return e.tracks
+                # Пустой результат может означать ошибку — не кэшируем
+                if result:
+                    _search_cache.set(key, result)
+                return result
+
+            task = asyncio.ensure_future(_fetch_and_store())
+            _inflight_searches[key] = task
+            task.add_done_callback(lambda _: _inflight_searches.pop(key, None))
+
+        # shield: отмена одного из ожидающих не отменяет общий поиск
+        tracks = await asyncio.shield(task)
+    else:
+        logger.info(f"YouTube search cache hit for {key}")
+
+    # Копии словарей: обработчики дописывают в треки служебные поля
+    return [dict(track) for track in tracks]
+
+
 class YouTubeService:
     def __init__(self):
         self.ytmusic = None
         self.cookies_file = None
         
         # Проверяем наличие файла cookies
-        cookies_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'youtube_cookies.txt')
-        if os.path.exists(cookies_path):
-            self.cookies_file = cookies_path
-            logger.info(f"YouTube cookies file found: {cookies_path}")
+        if os.path.exists(_COOKIES_PATH):
+            self.cookies_file = _COOKIES_PATH
+            logger.info(f"YouTube cookies file found: {_COOKIES_PATH}")
         else:
-            logger.warning(f"YouTube cookies file not found: {cookies_path}")
+            logger.warning(f"YouTube cookies file not found: {_COOKIES_PATH}")
             logger.warning("Download may fail due to YouTube bot protection. See COOKIES_SETUP.md for instructions.")
-        
-        try:
-            # Инициализируем YTMusic без авторизации
-            self.ytmusic = YTMusic()
-        except Exception as e:
-            logger.warning(f"Failed to initialize YTMusic: {e}")
+    
+    def _ensure_ytmusic(self) -> Optional[YTMusic]:
+        """Инициализирует YTMusic при первом обращении или после неудачной попытки (вызывается через executor)"""
+        if self.ytmusic is None:
+            try:
+                # Инициализируем YTMusic без авторизации
+                self.ytmusic = YTMusic()
+            except Exception as e:
+                logger.warning(f"Failed to initialize YTMusic: {e}")
+        return self.ytmusic
     
     async def search(self, query: str, max_results: int = 50) -> List[Dict[str, Any]]:
-        """Поиск в YouTube"""
+        """Поиск в YouTube (с кэшированием результатов)"""
+        key = (query.casefold().strip(), max_results, 'search')
+        return await _cached_search(key, lambda: self._search(query, max_results))
+
+    async def _search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Поиск в YouTube без кэша"""
+        if not _breaker.allow():
+            logger.warning(f"YouTube circuit is open, skipping search for '{query}'")
+            return []
+
         try:
-            # Настройки yt-dlp для поиска
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,
-                'default_search': 'ytsearch50:',
-            }
+            # Выполняем поиск (экземпляр YoutubeDL переиспользуется в рамках потока)
+            search_results = await asyncio.get_running_loop().run_in_executor(
+                _executor, lambda: _get_search_ydl().extract_info(f"ytsearch{max_results}:{query}", download=False)
+            )
+            _breaker.record_success()
+            
+            tracks = []
+            entries = search_results.get('entries') if search_results else None
+            for i, entry in enumerate(islice(entries or (), max_results)):
+                if entry and (track := self._format_youtube_track(entry, i)):
+                    tracks.append(track)
+            
+            logger.info(f"YouTube search for '{query}' returned {len(tracks)} results")
+            return tracks
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Выполняем поиск
-                search_results = await asyncio.get_event_loop().run_in_executor(
-                    None, lambda: ydl.extract_info(f"ytsearch{max_results}:{query}", download=False)
-                )
-                
-                tracks = []
-                if search_results and 'entries' in search_results:
-                    for i, entry in enumerate(search_results['entries'][:max_results]):
-                        if entry:
-                            track = self._format_youtube_track(entry, i)
-                            if track:
-                                tracks.append(track)
-                
-                logger.info(f"YouTube search for '{query}' returned {len(tracks)} results")
-                return tracks
-                
         except Exception as e:
+            _record_youtube_error(e)
             logger.error(f"YouTube search error: {e}")
             return []
     
     async def search_music(self, query: str, max_results: int = 50) -> List[Dict[str, Any]]:
-        """Поиск в YouTube Music"""
+        """Поиск в YouTube Music (с кэшированием результатов)"""
+        key = (query.casefold().strip(), max_results, 'search_music')
+        return await _cached_search(key, lambda: self._search_music(query, max_results))
+
+    async def search_music_many(self, queries: List[str], max_results: int = 5, concurrency: int = 6) -> List[List[Dict[str, Any]]]:
+        """
+        Выполняет несколько поисков в YouTube Music параллельно
+
+        Args:
+            queries: Список поисковых запросов
+            max_results: Максимальное количество результатов на запрос
+            concurrency: Максимальное число одновременных запросов
+
+        Returns:
+            Список результатов search_music() в порядке queries
+        """
+        return await gather_limited((self.search_music(query, max_results) for query in queries), concurrency)
+
+    async def _search_music(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Поиск в YouTube Music без кэша"""
+        # Сервис общий на весь процесс — при сбое инициализации пробуем снова на следующем запросе
+        if self.ytmusic is None:
+            await asyncio.get_running_loop().run_in_executor(_executor, self._ensure_ytmusic)
+
         if not self.ytmusic:
             logger.warning("YTMusic not initialized, falling back to regular YouTube search")
-            return await self.search(query, max_results)
+            # Результаты обычного YouTube не должны попасть в кэш под ключом YouTube Music
+            raise _UncacheableResult(await self.search(query, max_results))
+
+        if not _breaker.allow():
+            logger.warning(f"YouTube circuit is open, skipping YouTube Music search for '{query}'")
+            return []
 
         try:
-            logger.debug(f"Searching YouTube Music for: '{query}', max_results={max_results}")
+            logger.debug("Searching YouTube Music for: '%s', max_results=%d", query, max_results)
 
             # Поиск в YouTube Music
-            search_results = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: self.ytmusic.search(query, filter="songs", limit=max_results)
+            search_results = await asyncio.get_running_loop().run_in_executor(
+                _executor, lambda: self.ytmusic.search(query, filter="songs", limit=max_results)
             )
+            _breaker.record_success()
 
             logger.info(f"YouTube Music API returned {len(search_results)} results")
 
-            tracks = []
-            seen_ids = set()  # Отслеживаем уникальные ID треков
-
-            for i, result in enumerate(search_results[:max_results]):
-                try:
-                    track = self._format_ytmusic_track(result, i)
-                    if track:
-                        track_id = track.get('id')
-                        # Пропускаем дубликаты
-                        if track_id not in seen_ids:
-                            seen_ids.add(track_id)
-                            tracks.append(track)
-                            logger.debug(f"Formatted track {i}: {track.get('artist')} - {track.get('title')} (ID: {track_id})")
-                        else:
-                            logger.debug(f"Skipping duplicate track {i}: {track_id}")
-                except Exception as track_error:
-                    logger.warning(f"Failed to format track {i}: {track_error}", exc_info=True)
-                    continue
+            tracks = dedup_tracks(self._format_ytmusic_track(result, i) for i, result in enumerate(search_results[:max_results]))
 
             logger.info(f"YouTube Music search for '{query}' returned {len(tracks)} unique tracks (filtered from {len(search_results)} total)")
             return tracks
 
         except Exception as e:
+            _record_youtube_error(e)
             logger.error(f"YouTube Music search error: {e}", exc_info=True)
-            # Fallback to regular YouTube search
-            return await self.search(query, max_results)
+            # Fallback to regular YouTube search (без кэширования под ключом YouTube Music)
+            raise _UncacheableResult(await self.search(query, max_results))
     
     async def download(self, track_info: Dict[str, Any], output_path: str) -> bool:
-        """Скачивает трек"""
+        """Скачивает трек (одновременные загрузки одного видео выполняются один раз)"""
+        video_id = track_info.get('id')
+        if not video_id:
+            return await self._download(track_info, output_path)
+
+        pending = _inflight_downloads.get(video_id)
+        if pending is not None:
+            logger.info(f"Waiting for in-flight download of {video_id}")
+            src_path = await asyncio.shield(pending)
+            if src_path and self._link_or_copy(src_path, output_path):
+                logger.info(f"✅ Reused in-flight download of {video_id}: {output_path}")
+                return True
+            # Первая загрузка не удалась или файл уже удален — качаем сами
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight_downloads[video_id] = future
+        try:
+            success = await self._download(track_info, output_path)
+            future.set_result(output_path if success else None)
+            return success
+        finally:
+            if not future.done():
+                future.set_result(None)
+            if _inflight_downloads.get(video_id) is future:
+                del _inflight_downloads[video_id]
+
+    async def download_many(self, items: List[Tuple[Dict[str, Any], str]], concurrency: int = 4) -> List[bool]:
+        """
+        Скачивает несколько треков параллельно
+
+        Args:
+            items: Список пар (информация о треке, путь для сохранения)
+            concurrency: Максимальное число одновременных загрузок (больше — риск капчи YouTube)
+
+        Returns:
+            Список результатов download() в порядке items
+        """
+        return await gather_limited((self.download(track_info, path) for track_info, path in items), concurrency)
+
+    @staticmethod
+    def _link_or_copy(src_path: str, output_path: str) -> bool:
+        """Делает жесткую ссылку (или копию) готового файла по пути output_path"""
+        if src_path == output_path:
+            return os.path.exists(output_path)
+        try:
+            try:
+                os.link(src_path, output_path)
+            except OSError:
+                shutil.copyfile(src_path, output_path)
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to reuse downloaded file {src_path}: {e}")
+            return False
+
+    async def _download(self, track_info: Dict[str, Any], output_path: str) -> bool:
+        """Скачивает трек через yt-dlp"""
         try:
             video_id = track_info.get('id')
             title = track_info.get('title', 'Unknown')
@@ -116,18 +348,18 @@ class YouTubeService:
                 logger.error(f"No video ID provided for download: {title}")
                 return False
 
+            if not _breaker.allow():
+                logger.warning(f"YouTube circuit is open, skipping download: {title} (ID: {video_id})")
+                return False
+
             logger.info(f"Starting download: {title} (ID: {video_id})")
 
             # Настройки yt-dlp с PO Token для обхода bot detection
             ydl_opts = {
                 # Предпочитаем https протокол (не m3u8/HLS) для избежания 403 на фрагментах
                 'format': 'bestaudio[protocol=https]/bestaudio[protocol=http]/bestaudio/best',
+                # Сохраняем исходную дорожку: в mp3 перекодируем отдельно, вне потока yt-dlp
                 'outtmpl': output_path.replace('.mp3', '.%(ext)s'),
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': AUDIO_FORMAT,
-                    'preferredquality': AUDIO_QUALITY,
-                }],
                 'quiet': False,
                 'no_warnings': False,
                 # Обход блокировок
@@ -144,56 +376,60 @@ class YouTubeService:
                 'retries': 10,
                 'socket_timeout': 60,
                 'http_chunk_size': 10485760,
+                # Буфер чтения/записи 64 KiB и параллельная загрузка фрагментов DASH/HLS
+                'buffersize': 65536,
+                'concurrent_fragment_downloads': 4,
             }
 
             # НЕ указываем player_client - yt-dlp сам выберет лучший
             # Это позволяет получить https форматы вместо m3u8/HLS
 
-            # Если есть cookies, добавляем их
-            if self.cookies_file and os.path.exists(self.cookies_file):
+            # Если есть cookies, добавляем их (сервис живет долго, поэтому проверяем при каждой загрузке)
+            if os.path.exists(_COOKIES_PATH):
+                self.cookies_file = _COOKIES_PATH
                 ydl_opts['cookiefile'] = self.cookies_file
                 logger.info(f"✅ Using cookies file: {self.cookies_file}")
             else:
                 logger.info("Using android_music client without cookies")
 
             url = f"https://www.youtube.com/watch?v={video_id}"
-            logger.debug(f"Download URL: {url}")
+            logger.debug("Download URL: %s", url)
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                await asyncio.get_event_loop().run_in_executor(
-                    None, lambda: ydl.download([url])
-                )
+            def _fetch() -> Optional[str]:
+                """Скачивает дорожку и возвращает путь к файлу, который записал yt-dlp"""
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.extract_info(url, download=True)
+                    if not info:
+                        return None
+                    if info.get('requested_downloads'):
+                        return info['requested_downloads'][0]['filepath']
+                    return ydl.prepare_filename(info)
 
-            # Проверяем, что файл создан
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                logger.info(f"✅ Successfully downloaded: {title} ({file_size} bytes)")
-                return True
-            else:
-                # Ищем файл с другим расширением
-                base_path = output_path.rsplit('.', 1)[0]
-                for ext in ['mp3', 'm4a', 'webm', 'ogg', 'opus', 'wav']:
-                    alt_path = f"{base_path}.{ext}"
-                    if os.path.exists(alt_path):
-                        # Переименовываем в нужное расширение
-                        if ext != 'mp3':
-                            os.rename(alt_path, output_path)
-                            logger.info(f"Downloaded and renamed: {ext} -> mp3")
-                        file_size = os.path.getsize(output_path)
-                        logger.info(f"✅ Successfully downloaded: {title} ({file_size} bytes)")
-                        return True
-
-                # Проверяем наличие .mhtml файла (ошибка скачивания)
-                mhtml_path = f"{base_path}.mhtml"
-                if os.path.exists(mhtml_path):
-                    os.remove(mhtml_path)
-                    logger.error(f"❌ Downloaded HTML instead of video - authentication issue")
-                    return False
+            src_path = await asyncio.get_running_loop().run_in_executor(_executor, _fetch)
+            _breaker.record_success()
 
-                logger.error(f"❌ Download completed but file not found: {output_path}")
+            if not src_path or not os.path.exists(src_path):
+                logger.error(f"❌ Download completed but file not found: {src_path or output_path}")
                 return False
 
+            # Вместо аудио пришла HTML-страница (ошибка скачивания)
+            if src_path.endswith('.mhtml'):
+                os.remove(src_path)
+                logger.error(f"❌ Downloaded HTML instead of video - authentication issue")
+                return False
+
+            # yt-dlp отдает исходную дорожку (m4a, webm, mp4...) — перекодируем ее в нужный формат
+            if src_path != output_path:
+                if not await _transcode_audio(src_path, output_path):
+                    return False
+                logger.info(f"Transcoded with ffmpeg: {os.path.splitext(src_path)[1]} -> {AUDIO_FORMAT}")
+
+            file_size = os.stat(output_path).st_size
+            logger.info(f"✅ Successfully downloaded: {title} ({file_size} bytes)")
+            return True
+
         except Exception as e:
+            _record_youtube_error(e)
             logger.error(f"❌ Download error for {track_info.get('title', 'Unknown')}: {e}", exc_info=True)
             return False
     
@@ -207,8 +443,16 @@ class YouTubeService:
             duration = entry.get('duration', 0)
             uploader = entry.get('uploader', 'Unknown')
             
-            # Пытаемся извлечь исполнителя из названия
-            artist = self._extract_artist_from_title(title)
+            artists = entry.get('artists')
+            if artists:
+                # Новые версии yt-dlp сами заполняют список исполнителей
+                artist = ', '.join(artists)
+            elif uploader and uploader.endswith(' - Topic'):
+                # Автоматический канал исполнителя: "Artist - Topic"
+                artist = uploader[:-len(' - Topic')]
+            else:
+                # Пытаемся извлечь исполнителя из названия
+                artist = self._extract_artist_from_title(title)
             
             return {
                 'id': entry['id'],
@@ -242,6 +486,9 @@ class YouTubeService:
             # Конвертируем длительность в секунды
             duration = self._parse_duration(duration_text)
 
+            thumbnails = result.get('thumbnails')
+            album = result.get('album')
+
             formatted = {
                 'id': video_id,
                 'title': title,
@@ -250,11 +497,11 @@ class YouTubeService:
                 'quality': 'high',
                 'source': 'youtube_music',
                 'url': f"https://www.youtube.com/watch?v={video_id}",
-                'thumbnail': result.get('thumbnails', [{}])[-1].get('url'),
-                'album': result.get('album', {}).get('name') if result.get('album') else None
+                'thumbnail': thumbnails[-1].get('url') if thumbnails else None,
+                'album': album.get('name') if album else None
             }
 
-            logger.debug(f"Formatted YouTube Music track: {artist} - {title} (ID: {video_id}, duration: {duration}s)")
+            logger.debug("Formatted YouTube Music track: %s - %s (ID: %s, duration: %ss)", artist, title, video_id, duration)
             return formatted
 
         except Exception as e:
@@ -263,26 +510,23 @@ class YouTubeService:
     
     def _extract_artist_from_title(self, title: str) -> Optional[str]:
         """Пытается извлечь исполнителя из названия видео"""
-        # Общие паттерны для извлечения исполнителя
-        patterns = [
-            r'^([^-]+)\s*-\s*(.+)$',  # "Artist - Title"
-            r'^([^–]+)\s*–\s*(.+)$',  # "Artist – Title" (em dash)
-            r'^([^|]+)\s*\|\s*(.+)$',  # "Artist | Title"
-            r'^([^:]+):\s*(.+)$',     # "Artist: Title"
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, title.strip())
+        title = title.strip()
+        for pattern in _ARTIST_PATTERNS:
+            match = pattern.match(title)
             if match:
                 artist = match.group(1).strip()
                 # Проверяем, что это не слишком длинное название
-                if len(artist) < 50 and not any(word in artist.lower() for word in ['official', 'video', 'lyrics', 'audio']):
-                    return artist
-        
+                if len(artist) < 50:
+                    artist_lower = artist.lower()
+                    if not any(word in artist_lower for word in _ARTIST_BANWORDS):
+                        return artist
+
         return None
     
-    def _parse_duration(self, duration_str: str) -> int:
-        """Парсит строку длительности в секунды"""
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_duration(duration_str: str) -> int:
+        """Парсит строку длительности в секунды (строки повторяются, поэтому кэшируем)"""
         try:
             if not duration_str:
                 return 0
@@ -300,3 +544,15 @@ class YouTubeService:
                 
         except (ValueError, AttributeError):
             return 0
+
+
+# Общий экземпляр сервиса: состояния запроса он не хранит, а YTMusic() создается один раз
+_service: Optional[YouTubeService] = None
+
+
+def get_youtube_service() -> YouTubeService:
+    """Возвращает общий экземпляр YouTubeService, создавая его при первом обращении"""
+    global _service
+    if _service is None:
+        _service = YouTubeService()
+    return _service
@@ -1,41 +1,58 @@
 import asyncio
+import bisect
 import logging
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, Callable, Tuple
+import aiohttp
 import yt_dlp
 
 from config import DOWNLOADS_DIR, VK_LOGIN, VK_PASSWORD
+from utils.cache import TTLCache
+from utils.circuit_breaker import CircuitBreaker
+from utils.http import get_session
 
 logger = logging.getLogger(__name__)
 
+# Отдельный пул потоков для yt-dlp (не занимает default executor)
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ytdl')
+
+# Кэш информации о видео: (платформа, ID видео) -> результат get_video_info
+_info_cache = TTLCache(maxsize=128, ttl=300)
+
+# oEmbed YouTube: дешевая проверка существования видео до запуска yt-dlp
+OEMBED_URL = 'https://www.youtube.com/oembed'
+# Результаты проверки: ID видео -> существует ли видео
+_oembed_cache = TTLCache(maxsize=512, ttl=300)
+# Если oEmbed недоступен с сервера (без WARP), перестаем тратить на него время
+_oembed_breaker = CircuitBreaker('youtube-oembed', max_failures=3, reset_after=600)
+# Таймаут запроса oEmbed: проверка не должна заметно задерживать ответ
+OEMBED_TIMEOUT = aiohttp.ClientTimeout(total=3)
+
+# Экземпляры YoutubeDL для получения информации, по одному на поток и набор опций
+_thread_local = threading.local()
+
 # WARP прокси для обхода блокировок YouTube
 WARP_PROXY = 'socks5h://127.0.0.1:40000'
 
-# Паттерны для YouTube ссылок
-YOUTUBE_URL_PATTERNS = [
-    r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-    r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([a-zA-Z0-9_-]{11})',
-    r'(?:https?://)?youtu\.be/([a-zA-Z0-9_-]{11})',
-    r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-    r'(?:https?://)?(?:m\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-]
-
-# Паттерны для Rutube ссылок
-RUTUBE_URL_PATTERNS = [
-    r'(?:https?://)?(?:www\.)?rutube\.ru/video/([a-f0-9]+)',
-    r'(?:https?://)?(?:www\.)?rutube\.ru/shorts/([a-f0-9]+)',
-    r'(?:https?://)?(?:www\.)?rutube\.ru/play/embed/([a-f0-9]+)',
-]
-
-# Паттерны для VK Video ссылок
-VK_VIDEO_URL_PATTERNS = [
-    r'(?:https?://)?(?:www\.)?vkvideo\.ru/video(-?\d+_\d+)',
-    r'(?:https?://)?(?:www\.)?vkvideo\.ru/clip(-?\d+_\d+)',
-    r'(?:https?://)?(?:www\.)?vk\.com/video(-?\d+_\d+)',
-    r'(?:https?://)?(?:www\.)?vk\.com/clip(-?\d+_\d+)',
-    r'(?:https?://)?(?:www\.)?vk\.com/video\?z=video(-?\d+_\d+)',
-]
+# Паттерны ссылок: одно регулярное выражение на платформу, группа 1 — ID видео
+# YouTube: youtube.com/watch?v=, /shorts/, /embed/ (включая www., m., music.) и youtu.be/
+YOUTUBE_URL_RE = re.compile(r'(?:youtube\.com/(?:watch\?v=|shorts/|embed/)|youtu\.be/)([a-zA-Z0-9_-]{11})')
+
+# Rutube: /video/, /shorts/, /play/embed/
+RUTUBE_URL_RE = re.compile(r'rutube\.ru/(?:video|shorts|play/embed)/([a-f0-9]+)')
+
+# VK Video: vkvideo.ru и vk.com, /video, /clip и vk.com/video?z=video
+VK_VIDEO_URL_RE = re.compile(r'(?:vkvideo\.ru|vk\.com)/(?:video\?z=video|video|clip)(-?\d+_\d+)')
+
+# Минимальный интервал между вызовами progress_callback при скачивании (секунды)
+PROGRESS_CALLBACK_INTERVAL = 1.0
+
+# Пороги сокращения числа просмотров: (делитель, суффикс), от большего к меньшему
+_VIEW_TIERS = ((1_000_000, 'M'), (1_000, 'K'))
 
 # Доступные качества видео
 VIDEO_QUALITIES = {
@@ -48,40 +65,90 @@ VIDEO_QUALITIES = {
 }
 
 
+def _humanize_error(error_msg: str) -> str:
+    """Извлекает понятное сообщение из текста ошибки yt-dlp"""
+    error_lower = error_msg.lower()
+    if "429" in error_msg:
+        return "HTTP 429: Слишком много запросов. Попробуйте через минуту"
+    elif "403" in error_msg:
+        return "HTTP 403: Доступ запрещён (возможно, нужны свежие cookies)"
+    elif "404" in error_msg:
+        return "HTTP 404: Видео не найдено"
+    elif "Sign in" in error_msg or "age_limit" in error_lower or "age restrict" in error_lower:
+        return "Требуется авторизация (возрастное ограничение)"
+    elif "Private video" in error_msg:
+        return "Приватное видео"
+    elif "only available to followers" in error_lower:
+        return "Видео доступно только подписчикам"
+    elif "unavailable" in error_lower:
+        return "Видео недоступно"
+    return error_msg
+
+
+def _get_info_ydl(opts: Dict[str, Any]) -> yt_dlp.YoutubeDL:
+    """Возвращает экземпляр YoutubeDL для extract_info, созданный для текущего потока
+
+    Только для опций без cookiefile: YoutubeDL.close() записывает свой cookie jar
+    обратно в файл, и долгоживущий экземпляр затирал бы свежие cookies устаревшими.
+    """
+    instances = getattr(_thread_local, 'info_ydls', None)
+    if instances is None:
+        instances = _thread_local.info_ydls = {}
+
+    key = tuple(sorted(opts.items()))
+    ydl = instances.get(key)
+    if ydl is None:
+        ydl = instances[key] = yt_dlp.YoutubeDL(opts)
+    return ydl
+
+
 class YouTubeVideoService:
     def __init__(self):
-        self.cookies_file = None
+        self._cookies_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'youtube_cookies.txt')
 
         # Проверяем наличие файла cookies
-        cookies_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'youtube_cookies.txt')
-        if os.path.exists(cookies_path):
-            self.cookies_file = cookies_path
-            logger.info(f"YouTube Video: cookies file found: {cookies_path}")
+        if os.path.exists(self._cookies_path):
+            logger.info(f"YouTube Video: cookies file found: {self._cookies_path}")
         else:
-            logger.warning(f"YouTube Video: cookies file not found: {cookies_path}")
+            logger.warning(f"YouTube Video: cookies file not found: {self._cookies_path}")
+
+    @property
+    def cookies_file(self) -> Optional[str]:
+        """Путь к файлу cookies, если он есть (может появиться позже через /cookies)"""
+        return self._cookies_path if os.path.exists(self._cookies_path) else None
 
     def extract_video_id(self, url: str) -> Optional[str]:
         """Извлекает ID видео из YouTube URL"""
-        for pattern in YOUTUBE_URL_PATTERNS:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        # Дешевая проверка подстроки отсекает большинство сообщений без regex
+        if 'youtu' not in url:
+            return None
+        match = YOUTUBE_URL_RE.search(url)
+        return match.group(1) if match else None
 
     def extract_rutube_id(self, url: str) -> Optional[str]:
         """Извлекает ID видео из Rutube URL"""
-        for pattern in RUTUBE_URL_PATTERNS:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        # Дешевая проверка подстроки отсекает большинство сообщений без regex
+        if 'rutube.ru' not in url:
+            return None
+        match = RUTUBE_URL_RE.search(url)
+        return match.group(1) if match else None
 
     def extract_vk_video_id(self, url: str) -> Optional[str]:
         """Извлекает ID видео из VK Video URL"""
-        for pattern in VK_VIDEO_URL_PATTERNS:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        # Дешевая проверка подстроки отсекает большинство сообщений без regex
+        if 'vk' not in url:
+            return None
+        match = VK_VIDEO_URL_RE.search(url)
+        return match.group(1) if match else None
+
+    def extract_platform_video_id(self, platform: Optional[str], url: str) -> Optional[str]:
+        """Извлекает ID видео для уже определенной платформы"""
+        if platform == 'youtube':
+            return self.extract_video_id(url)
+        elif platform == 'rutube':
+            return self.extract_rutube_id(url)
+        elif platform == 'vkvideo':
+            return self.extract_vk_video_id(url)
         return None
 
     def is_youtube_url(self, text: str) -> bool:
@@ -119,6 +186,21 @@ class YouTubeVideoService:
         try:
             platform = self.detect_platform(url)
 
+            video_id = self.extract_platform_video_id(platform, url)
+            cache_key = (platform, video_id) if video_id else None
+            if cache_key:
+                cached = _info_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Video info cache hit for {platform}:{video_id}")
+                    # Поля, зависящие от присланной ссылки, пересчитываем
+                    result = dict(cached)
+                    result['url'] = url
+                    result['is_short'] = '/shorts/' in url or result['duration'] <= 60
+                    return result, None
+
+            if platform == 'youtube' and video_id and not await self._oembed_check(video_id):
+                return None, "HTTP 404: Видео не найдено"
+
             ydl_opts = {
                 'quiet': True,
                 'no_warnings': True,
@@ -140,18 +222,21 @@ class YouTubeVideoService:
                     logger.info(f"Using cookies for video info: {self.cookies_file}")
 
             def _extract(opts):
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    return ydl.extract_info(url, download=False)
+                if 'cookiefile' in opts:
+                    # С cookies — отдельный экземпляр на вызов, чтобы jar сохранялся как раньше
+                    with yt_dlp.YoutubeDL(opts) as ydl:
+                        return ydl.extract_info(url, download=False)
+                return _get_info_ydl(opts).extract_info(url, download=False)
 
             async def _extract_with_fallback(opts: dict) -> dict:
                 """Extract info, retrying with format='best' if format unavailable."""
                 try:
-                    return await asyncio.get_event_loop().run_in_executor(None, lambda: _extract(opts))
+                    return await asyncio.get_running_loop().run_in_executor(_executor, lambda: _extract(opts))
                 except Exception as e:
                     if 'Requested format is not available' in str(e):
                         logger.warning("Format unavailable, retrying with format='best'")
                         fallback = {**opts, 'format': 'best'}
-                        return await asyncio.get_event_loop().run_in_executor(None, lambda: _extract(fallback))
+                        return await asyncio.get_running_loop().run_in_executor(_executor, lambda: _extract(fallback))
                     raise
 
             info = None
@@ -180,7 +265,7 @@ class YouTubeVideoService:
             # Определяем доступные качества
             available_qualities, quality_sizes = self._get_available_qualities(info)
 
-            return {
+            result = {
                 'id': info.get('id'),
                 'title': info.get('title', 'Unknown'),
                 'channel': info.get('uploader', info.get('channel', 'Unknown')),
@@ -192,28 +277,48 @@ class YouTubeVideoService:
                 'available_qualities': available_qualities,
                 'quality_sizes': quality_sizes,
                 'is_short': '/shorts/' in url or info.get('duration', 0) <= 60,
-            }, None
+            }
+            if cache_key:
+                _info_cache.set(cache_key, result)
+            return dict(result), None
 
         except Exception as e:
             logger.error(f"Error getting video info: {e}", exc_info=True)
             error_msg = str(e)
             if "reloaded" in error_msg.lower():
-                error_msg = "NEEDS_RELOAD"
-            elif "429" in error_msg:
-                error_msg = "HTTP 429: Слишком много запросов. Попробуйте через минуту"
-            elif "403" in error_msg:
-                error_msg = "HTTP 403: Доступ запрещён (возможно, нужны свежие cookies)"
-            elif "404" in error_msg:
-                error_msg = "HTTP 404: Видео не найдено"
-            elif "Sign in" in error_msg or "age_limit" in error_msg.lower() or "age restrict" in error_msg.lower():
-                error_msg = "Требуется авторизация (возрастное ограничение)"
-            elif "Private video" in error_msg:
-                error_msg = "Приватное видео"
-            elif "only available to followers" in error_msg.lower():
-                error_msg = "Видео доступно только подписчикам"
-            elif "unavailable" in error_msg.lower():
-                error_msg = "Видео недоступно"
-            return None, error_msg
+                return None, "NEEDS_RELOAD"
+            return None, _humanize_error(error_msg)
+
+    async def _oembed_check(self, video_id: str) -> bool:
+        """Проверяет через oEmbed, что YouTube видео существует
+
+        Returns:
+            False только если YouTube однозначно ответил, что видео нет (400/404).
+            При любой другой ошибке возвращает True — решение остается за yt-dlp
+        """
+        cached = _oembed_cache.get(video_id)
+        if cached is not None:
+            return cached
+
+        if not _oembed_breaker.allow():
+            return True
+
+        params = {'url': f"https://www.youtube.com/watch?v={video_id}", 'format': 'json'}
+        try:
+            async with get_session().get(OEMBED_URL, params=params, timeout=OEMBED_TIMEOUT) as response:
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"oEmbed check failed for {video_id}: {e}")
+            _oembed_breaker.record_failure()
+            return True
+
+        _oembed_breaker.record_success()
+        # 401/403 — приватное видео или запрет встраивания: такие видео yt-dlp может скачать с cookies
+        exists = status not in (400, 404)
+        if not exists:
+            logger.info(f"oEmbed: YouTube video {video_id} not found (HTTP {status})")
+        _oembed_cache.set(video_id, exists)
+        return exists
 
     def _get_available_qualities(self, info: Dict) -> Tuple[List[str], Dict[str, int]]:
         """Определяет доступные качества и примерные размеры для видео"""
@@ -225,25 +330,24 @@ class YouTubeVideoService:
         video_sizes: Dict[int, int] = {}  # height -> best filesize
         best_audio_size = 0
 
+        video_sizes_get = video_sizes.get
+        add_height = heights.add
+
         for fmt in formats:
             height = fmt.get('height')
+            has_video = fmt.get('vcodec', 'none') != 'none'
+            has_audio = fmt.get('acodec', 'none') != 'none'
+
             if height:
-                heights.add(height)
-                size = fmt.get('filesize') or fmt.get('filesize_approx') or 0
-                vcodec = fmt.get('vcodec', 'none')
-                acodec = fmt.get('acodec', 'none')
-
-                if vcodec != 'none' and acodec == 'none':
-                    # Video-only stream
-                    if height not in video_sizes or size > video_sizes[height]:
-                        video_sizes[height] = size
-                elif vcodec != 'none' and acodec != 'none':
-                    # Combined stream
-                    if height not in video_sizes or size > video_sizes[height]:
+                add_height(height)
+                if has_video:
+                    # Video-only or combined stream
+                    size = fmt.get('filesize') or fmt.get('filesize_approx') or 0
+                    if size > video_sizes_get(height, -1):
                         video_sizes[height] = size
 
-            # Track best audio size
-            if fmt.get('acodec', 'none') != 'none' and fmt.get('vcodec', 'none') == 'none':
+            if has_audio and not has_video:
+                # Track best audio size
                 asize = fmt.get('filesize') or fmt.get('filesize_approx') or 0
                 if asize > best_audio_size:
                     best_audio_size = asize
@@ -257,21 +361,21 @@ class YouTubeVideoService:
         elif duration > 0:
             quality_sizes['audio'] = int(192_000 * duration / 8)  # ~192kbps estimate
 
+        sorted_heights = sorted(heights)
         for quality in ['360p', '480p', '720p', '1080p']:
             target_height = int(quality[:-1])
-            if any(h >= target_height for h in heights):
+            # Find closest height >= target
+            idx = bisect.bisect_left(sorted_heights, target_height)
+            if idx < len(sorted_heights):
                 available.append(quality)
-                # Find closest height >= target
-                matching = [h for h in sorted(heights) if h >= target_height]
-                if matching:
-                    closest = matching[0]
-                    vsize = video_sizes.get(closest, 0)
-                    if vsize:
-                        quality_sizes[quality] = vsize + best_audio_size
-                    elif duration > 0:
-                        # Rough estimate: bitrate * duration
-                        bitrates = {'360p': 700_000, '480p': 1_200_000, '720p': 2_500_000, '1080p': 5_000_000}
-                        quality_sizes[quality] = int(bitrates.get(quality, 1_000_000) * duration / 8)
+                closest = sorted_heights[idx]
+                vsize = video_sizes.get(closest, 0)
+                if vsize:
+                    quality_sizes[quality] = vsize + best_audio_size
+                elif duration > 0:
+                    # Rough estimate: bitrate * duration
+                    bitrates = {'360p': 700_000, '480p': 1_200_000, '720p': 2_500_000, '1080p': 5_000_000}
+                    quality_sizes[quality] = int(bitrates.get(quality, 1_000_000) * duration / 8)
 
         available.append('best')
         # Best quality = largest video + audio
@@ -309,35 +413,48 @@ class YouTubeVideoService:
 
             os.makedirs(output_dir, exist_ok=True)
 
-            # Получаем формат для выбранного качества
-            format_spec = VIDEO_QUALITIES.get(quality, VIDEO_QUALITIES['best'])['format']
+            # Получаем формат для выбранного качества (неизвестное качество — best)
+            quality_opts = VIDEO_QUALITIES.get(quality) or VIDEO_QUALITIES['best']
+            format_spec = quality_opts['format']
+            is_audio_only = quality_opts.get('audio_only', False)
 
             output_template = os.path.join(output_dir, '%(title)s.%(ext)s')
 
+            # Время последнего вызова progress_callback (список — для изменения из hook)
+            last_emit = [0.0]
+
             # Progress hook для yt-dlp
             def progress_hook(d):
                 # Check if download was cancelled
                 if is_cancelled and is_cancelled():
                     raise yt_dlp.utils.DownloadCancelled("Download cancelled by user")
 
-                if d['status'] == 'downloading' and progress_callback:
-                    progress_info = {
+                if not progress_callback:
+                    return
+
+                status = d['status']
+                get = d.get
+                if status == 'downloading':
+                    # yt-dlp вызывает hook на каждый блок — передаем прогресс не чаще раза в секунду
+                    now = time.monotonic()
+                    if now - last_emit[0] < PROGRESS_CALLBACK_INTERVAL:
+                        return
+                    last_emit[0] = now
+
+                    progress_callback({
                         'status': 'downloading',
-                        'downloaded_bytes': d.get('downloaded_bytes', 0),
-                        'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate', 0),
-                        'speed': d.get('speed', 0),
-                        'eta': d.get('eta', 0),
-                        'filename': d.get('filename', ''),
-                    }
-                    progress_callback(progress_info)
-                elif d['status'] == 'finished' and progress_callback:
+                        'downloaded_bytes': get('downloaded_bytes', 0),
+                        'total_bytes': get('total_bytes') or get('total_bytes_estimate', 0),
+                        'speed': get('speed', 0),
+                        'eta': get('eta', 0),
+                        'filename': get('filename', ''),
+                    })
+                elif status == 'finished':
                     progress_callback({
                         'status': 'finished',
-                        'filename': d.get('filename', ''),
+                        'filename': get('filename', ''),
                     })
 
-            is_audio_only = VIDEO_QUALITIES.get(quality, {}).get('audio_only', False)
-
             if is_audio_only:
                 postprocessors = [{
                     'key': 'FFmpegExtractAudio',
@@ -385,17 +502,13 @@ class YouTubeVideoService:
                         if 'requested_downloads' in info:
                             downloaded_file = info['requested_downloads'][0]['filepath']
                         else:
-                            # Пробуем построить путь
-                            ext = info.get('ext', 'mp4')
-                            title = info.get('title', 'video')
-                            # Очищаем название от недопустимых символов
-                            safe_title = re.sub(r'[<>:"/\\|?*]', '', title)
-                            downloaded_file = os.path.join(output_dir, f"{safe_title}.{ext}")
+                            # Строим путь тем же шаблоном и санитайзером, что и сам yt-dlp
+                            downloaded_file = ydl.prepare_filename(info)
 
             if platform == 'vkvideo':
                 # Try without auth first to avoid login rate limits for public videos
                 try:
-                    await asyncio.get_event_loop().run_in_executor(None, lambda: _download(ydl_opts))
+                    await asyncio.get_running_loop().run_in_executor(_executor, lambda: _download(ydl_opts))
                 except yt_dlp.utils.DownloadCancelled:
                     raise
                 except Exception as e:
@@ -403,15 +516,15 @@ class YouTubeVideoService:
                     if '429' in err:
                         logger.warning("VK download 429, waiting 5s and retrying...")
                         await asyncio.sleep(5)
-                        await asyncio.get_event_loop().run_in_executor(None, lambda: _download(ydl_opts))
+                        await asyncio.get_running_loop().run_in_executor(_executor, lambda: _download(ydl_opts))
                     elif VK_LOGIN and VK_PASSWORD and ('login' in err.lower() or 'sign in' in err.lower() or 'followers' in err.lower() or '403' in err):
                         logger.info("VK download requires auth, retrying with credentials...")
                         auth_opts = {**ydl_opts, 'username': VK_LOGIN, 'password': VK_PASSWORD}
-                        await asyncio.get_event_loop().run_in_executor(None, lambda: _download(auth_opts))
+                        await asyncio.get_running_loop().run_in_executor(_executor, lambda: _download(auth_opts))
                     else:
                         raise
             else:
-                await asyncio.get_event_loop().run_in_executor(None, lambda: _download(ydl_opts))
+                await asyncio.get_running_loop().run_in_executor(_executor, lambda: _download(ydl_opts))
 
             # Проверяем что файл существует
             if downloaded_file and os.path.exists(downloaded_file):
@@ -419,14 +532,14 @@ class YouTubeVideoService:
                 logger.info(f"Downloaded video: {downloaded_file} ({file_size / 1024 / 1024:.2f} MB)")
                 return downloaded_file, None
 
-            # Ищем скачанный файл в директории
+            # Ищем скачанный файл в директории (в executor — каталог может быть большим)
             search_ext = '.mp3' if is_audio_only else '.mp4'
-            for file in os.listdir(output_dir):
-                if file.endswith(search_ext):
-                    full_path = os.path.join(output_dir, file)
-                    if os.path.getmtime(full_path) > asyncio.get_event_loop().time() - 60:
-                        logger.info(f"Found downloaded video: {full_path}")
-                        return full_path, None
+            found = await asyncio.get_running_loop().run_in_executor(
+                _executor, self._find_recent_file, output_dir, search_ext
+            )
+            if found:
+                logger.info(f"Found downloaded video: {found}")
+                return found, None
 
             logger.error("Downloaded file not found")
             return None, "Файл не найден после скачивания"
@@ -438,44 +551,45 @@ class YouTubeVideoService:
         except Exception as e:
             logger.error(f"Error downloading video: {e}", exc_info=True)
             error_msg = str(e)
-            # Извлекаем понятное сообщение об ошибке
             if "cancelled" in error_msg.lower():
                 return None, "CANCELLED"
-            elif "429" in error_msg:
-                error_msg = "HTTP 429: Слишком много запросов. Попробуйте через минуту"
-            elif "403" in error_msg:
-                error_msg = "HTTP 403: Доступ запрещён (возможно, нужны свежие cookies)"
-            elif "404" in error_msg:
-                error_msg = "HTTP 404: Видео не найдено"
-            elif "Sign in" in error_msg or "age_limit" in error_msg.lower() or "age restrict" in error_msg.lower():
-                error_msg = "Требуется авторизация (возрастное ограничение)"
-            elif "Private video" in error_msg:
-                error_msg = "Приватное видео"
-            elif "only available to followers" in error_msg.lower():
-                error_msg = "Видео доступно только подписчикам"
-            elif "unavailable" in error_msg.lower():
-                error_msg = "Видео недоступно"
-            return None, error_msg
+            return None, _humanize_error(error_msg)
+
+    @staticmethod
+    def _find_recent_file(directory: str, ext: str, max_age: float = 60) -> Optional[str]:
+        """Ищет файл с расширением ext, измененный за последние max_age секунд (вызывается через executor)"""
+        # mtime — время по часам системы, поэтому сравниваем с time.time()
+        cutoff = time.time() - max_age
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(ext) and entry.stat().st_mtime > cutoff:
+                    return entry.path
+        return None
 
     def format_duration(self, seconds: int) -> str:
         """Форматирует длительность в читаемый формат"""
         if seconds < 60:
             return f"{seconds}s"
-        elif seconds < 3600:
-            minutes = seconds // 60
-            secs = seconds % 60
-            return f"{minutes}:{secs:02d}"
-        else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            secs = seconds % 60
+        hours, rem = divmod(seconds, 3600)
+        minutes, secs = divmod(rem, 60)
+        if hours:
             return f"{hours}:{minutes:02d}:{secs:02d}"
+        return f"{minutes}:{secs:02d}"
 
     def format_views(self, count: int) -> str:
         """Форматирует количество просмотров"""
-        if count < 1000:
-            return str(count)
-        elif count < 1000000:
-            return f"{count / 1000:.1f}K"
-        else:
-            return f"{count / 1000000:.1f}M"
+        for threshold, suffix in _VIEW_TIERS:
+            if count >= threshold:
+                return f"{count / threshold:.1f}{suffix}"
+        return str(count)
+
+# Общий экземпляр сервиса (используется фильтром ссылок на каждое сообщение)
+_service: Optional[YouTubeVideoService] = None
+
+
+def get_video_service() -> YouTubeVideoService:
+    """Возвращает общий экземпляр YouTubeVideoService, создавая его при первом обращении"""
+    global _service
+    if _service is None:
+        _service = YouTubeVideoService()
+    return _service
@@ -0,0 +1,70 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи для внешних сервисов
+
+    После max_failures ошибок подряд цепь размыкается (OPEN) и вызовы блокируются
+    на reset_after секунд. Затем пропускается один пробный вызов (HALF_OPEN):
+    успех замыкает цепь, ошибка снова размыкает ее с удвоенной задержкой
+    (не больше max_reset_after).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, max_failures: int = 5, reset_after: float = 300, max_reset_after: float = 3600):
+        self.name = name
+        self.max_failures = max_failures
+        self.reset_after = reset_after
+        self.max_reset_after = max_reset_after
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._current_reset_after = reset_after
+
+    def allow(self) -> bool:
+        """Проверяет, можно ли выполнить вызов"""
+        if self.state == self.CLOSED:
+            return True
+
+        # Пробный вызов пропускаем и повторно, если предыдущий так и не завершился
+        now = time.monotonic()
+        if now - self._opened_at >= self._current_reset_after:
+            logger.info(f"Circuit '{self.name}' half-open, allowing a probe call")
+            self.state = self.HALF_OPEN
+            self._opened_at = now
+            return True
+
+        # OPEN до истечения задержки или HALF_OPEN с уже идущим пробным вызовом
+        return False
+
+    def record_success(self):
+        """Отмечает успешный вызов"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.state = self.CLOSED
+        self._failures = 0
+        self._current_reset_after = self.reset_after
+
+    def record_failure(self):
+        """Отмечает неудачный вызов"""
+        self._failures += 1
+
+        if self.state == self.HALF_OPEN:
+            self._current_reset_after = min(self._current_reset_after * 2, self.max_reset_after)
+        elif self._failures < self.max_failures:
+            return
+
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(
+            f"Circuit '{self.name}' opened after {self._failures} failures, "
+            f"retrying in {self._current_reset_after:.0f}s"
+        )
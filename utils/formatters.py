@@ -1,6 +1,21 @@
+import functools
 import re
 from typing import List, Dict, Any
 
+# Регулярные выражения компилируются один раз при импорте
+_TITLE_CLEAN_RE = re.compile(r'[^\w\s\-\(\)\[\].,!?]')
+_BAD_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Таблица экранирования спецсимволов Markdown для str.translate
+_MARKDOWN_ESCAPE_TABLE = str.maketrans({char: f'\\{char}' for char in '_*[]()~`>#+-=|{}.!'})
+
+# Готовые прогресс-бары стандартной длины: индекс — число заполненных делений
+_PROGRESS_BAR_LENGTH = 10
+_PROGRESS_BARS = tuple("▓" * f + "░" * (_PROGRESS_BAR_LENGTH - f) for f in range(_PROGRESS_BAR_LENGTH + 1))
+
+# Длительности повторяются от рендера к рендеру — результат кэшируем
+@functools.lru_cache(maxsize=1024)
 def format_duration(seconds):
     """Форматирует длительность из секунд в MM:SS формат"""
     if not seconds or seconds == 0:
@@ -36,7 +51,7 @@ def format_track_title(title, artist=None, max_length=50):
         return "Unknown Track"
     
     # Очищаем название от лишних символов
-    title = re.sub(r'[^\w\s\-\(\)\[\].,!?]', '', title)
+    title = _TITLE_CLEAN_RE.sub('', title)
     
     if artist:
         formatted = f"{artist} - {title}"
@@ -65,20 +80,20 @@ def format_search_results_message(tracks: List[Dict[Any, Any]], source: str, que
     # Экранируем query для безопасного отображения
     safe_query = escape_markdown(query)
     
-    message = f"{emoji} **{source_name}** | Результаты для: \"{safe_query}\"\n\n"
+    parts = [f"{emoji} **{source_name}** | Результаты для: \"{safe_query}\"\n\n"]
 
     if not tracks:
-        message += "😔 Ничего не найдено. Попробуйте другой запрос."
-        return message
+        parts.append("😔 Ничего не найдено. Попробуйте другой запрос.")
+        return "".join(parts)
 
     # Информация о количестве результатов
-    message += f"Найдено: **{len(tracks)}** треков\n"
+    parts.append(f"Найдено: **{len(tracks)}** треков\n")
 
     # Добавляем информацию о страницах
     if total_pages > 1:
-        message += f"📄 Страница {page + 1} из {total_pages}"
+        parts.append(f"📄 Страница {page + 1} из {total_pages}")
     
-    return message
+    return "".join(parts)
 
 def format_progress_bar(progress: float, length: int = 10):
     """Создает прогресс-бар из символов"""
@@ -88,9 +103,10 @@ def format_progress_bar(progress: float, length: int = 10):
         progress = 100
     
     filled = int((progress / 100) * length)
-    empty = length - filled
-    
-    bar = "▓" * filled + "░" * empty
+    if length == _PROGRESS_BAR_LENGTH:
+        bar = _PROGRESS_BARS[filled]
+    else:
+        bar = "▓" * filled + "░" * (length - filled)
     return f"[{bar}] {progress:.0f}%"
 
 def format_download_status(title: str, progress: float = None):
@@ -123,9 +139,9 @@ def format_error_message(error_type: str, details: str = None):
 def clean_filename(filename: str):
     """Очищает имя файла от недопустимых символов"""
     # Удаляем недопустимые символы для имени файла
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
+    filename = _BAD_FILENAME_CHARS_RE.sub('', filename)
     # Заменяем множественные пробелы на один
-    filename = re.sub(r'\s+', ' ', filename)
+    filename = _WHITESPACE_RE.sub(' ', filename)
     # Убираем пробелы в начале и конце
     filename = filename.strip()
     
@@ -149,9 +165,4 @@ def format_audio_metadata(track_info: Dict[str, Any]):
 
 def escape_markdown(text: str):
     """Экранирует специальные символы для Markdown"""
-    escape_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-    
-    for char in escape_chars:
-        text = text.replace(char, f'\\{char}')
-    
-    return text
+    return text.translate(_MARKDOWN_ESCAPE_TABLE)
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Awaitable, Iterable, List, Optional, TypeVar
+
+import aiohttp
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+T = TypeVar('T')
+
+# Общая HTTP-сессия бота (соединения и DNS-кэш переиспользуются между сервисами)
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Возвращает общую aiohttp-сессию, создавая ее при первом обращении
+
+    Таймаут по умолчанию рассчитан на скачивание файлов; короткие запросы
+    передают свой timeout в вызов.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            # aiohttp 3.9 сам не переключается на aiodns — асинхронный резолвер указываем явно
+            resolver=aiohttp.AsyncResolver() if aiodns is not None else None,
+            limit=100,
+            limit_per_host=20,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=300),
+        )
+    return _session
+
+
+async def close_session():
+    """Закрывает общую aiohttp-сессию (вызывается при остановке бота)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def gather_limited(aws: Iterable[Awaitable[T]], concurrency: int) -> List[T]:
+    """Выполняет awaitables параллельно, не больше concurrency одновременно; результаты в исходном порядке"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run_one(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_run_one(aw) for aw in aws))
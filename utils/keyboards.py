@@ -1,127 +1,156 @@
+import functools
+import hashlib
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-from config import SOURCES
+from utils.cache import TTLCache
+from utils.formatters import format_duration
+
+# Номера треков на кнопках: 1️⃣..9️⃣ и 🔟 (для двузначных чисел keycap-символов нет)
+_NUMBER_EMOJI = ("1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟")
+
+# Кнопки выбора источника по рядам: (текст, callback_data)
+_SOURCE_BUTTON_ROWS = (
+    (("🎬 YouTube", "source_youtube"), ("🎵 YT Music", "source_youtube_music")),
+    (("🎶 VK Music", "source_vk_music"), ("🎧 Yandex Music", "source_yandex_music")),
+    (("🔊 SoundCloud", "source_soundcloud"),),
+)
+
+# Максимальная длина текста кнопки трека (номер, название, длительность и качество)
+TRACK_BUTTON_MAX_LENGTH = 64
+
+# Один символ многоточия вместо "..." экономит место в тексте кнопки
+ELLIPSIS = "…"
+
+# Telegram ограничивает callback_data 64 байтами, длинные запросы заменяем коротким токеном
+MAX_CALLBACK_QUERY_BYTES = 32
+# Токен -> исходный запрос (живет не меньше кэша результатов поиска)
+_query_tokens = TTLCache(maxsize=4096, ttl=3600)
+
+def _query_token(query):
+    """Возвращает запрос для callback_data: сам запрос, если он короткий, иначе его хэш"""
+    encoded = query.encode()
+    if len(encoded) <= MAX_CALLBACK_QUERY_BYTES:
+        return query
+    token = hashlib.blake2s(encoded, digest_size=6).hexdigest()
+    _query_tokens.set(token, query)
+    return token
+
+def resolve_query_token(token):
+    """Восстанавливает запрос из callback_data (короткие запросы передаются как есть)"""
+    return _query_tokens.get(token, token)
+
+# Статические клавиатуры не зависят от аргументов — строим их один раз при импорте
+_SOURCE_SELECTION_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text=text, callback_data=data) for text, data in row]
+    for row in _SOURCE_BUTTON_ROWS
+])
 
 def get_source_selection_keyboard():
-    """Создает клавиатуру для выбора источника поиска"""
-    builder = InlineKeyboardBuilder()
-    
-    # Первый ряд: YouTube и YouTube Music
-    builder.row(
-        InlineKeyboardButton(text="🎬 YouTube", callback_data="source_youtube"),
-        InlineKeyboardButton(text="🎵 YT Music", callback_data="source_youtube_music")
-    )
-    
-    # Второй ряд: VK Music и Yandex Music
-    builder.row(
-        InlineKeyboardButton(text="🎶 VK Music", callback_data="source_vk_music"),
-        InlineKeyboardButton(text="🎧 Yandex Music", callback_data="source_yandex_music")
-    )
-    
-    # Третий ряд: SoundCloud
-    builder.row(
-        InlineKeyboardButton(text="🔊 SoundCloud", callback_data="source_soundcloud")
+    """Возвращает клавиатуру для выбора источника поиска"""
+    return _SOURCE_SELECTION_KEYBOARD
+
+def _truncate(text, max_length):
+    """Обрезает текст до max_length символов, заканчивая многоточием"""
+    if len(text) <= max_length:
+        return text
+    return f"{text[:max_length - len(ELLIPSIS)]}{ELLIPSIS}"
+
+def _track_fingerprint(i, track):
+    """Возвращает поля трека, влияющие на кнопку: (название, исполнитель, длительность, качество, ID)"""
+    return (
+        track.get('title', 'Unknown'),
+        track.get('artist', ''),
+        track.get('duration'),
+        track.get('quality', 'N/A'),
+        track.get('id', i),
     )
-    
-    return builder.as_markup()
+
+def _make_track_button(i, fields, cb_prefix):
+    """Создает кнопку скачивания для трека из результатов поиска"""
+    title, artist, raw_duration, quality, track_id = fields
+    track_number = _NUMBER_EMOJI[i] if i < len(_NUMBER_EMOJI) else f"{i + 1}."
+    duration = format_duration(raw_duration)
+
+    # Формируем текст кнопки: исполнитель - название | длительность | качество
+    if artist:
+        full_name = f"{artist} - {title}"
+    else:
+        full_name = title
+
+    # Сначала резервируем место под длительность и качество, остаток отдаем названию
+    quality_text = f" | 🎧 {quality}" if quality != 'N/A' else ""
+    suffix = f" | ⏱️ {duration}{quality_text}"
+    budget = max(TRACK_BUTTON_MAX_LENGTH - len(track_number) - 1 - len(suffix), 1)
+    button_text = f"{track_number} {_truncate(full_name, budget)}{suffix}"
+
+    callback_data = cb_prefix + str(track_id)
+
+    return InlineKeyboardButton(text=button_text, callback_data=callback_data)
 
 def get_search_results_keyboard(tracks, page=0, total_pages=1, source="", query=""):
     """Создает клавиатуру с результатами поиска"""
-    builder = InlineKeyboardBuilder()
-    
-    # Добавляем кнопки для каждого трека
-    for i, track in enumerate(tracks):
-        from utils.formatters import format_duration
-
-        track_number = f"{i + 1}️⃣"
-        title = track.get('title', 'Unknown')
-        artist = track.get('artist', '')
-        duration = format_duration(track.get('duration'))
-        quality = track.get('quality', 'N/A')
-
-        # Формируем текст кнопки: исполнитель - название | длительность | качество
-        if artist:
-            full_name = f"{artist} - {title}"
-        else:
-            full_name = title
-
-        button_text = f"{track_number} {full_name}"
-
-        # Обрезаем название если слишком длинное (оставляем место для длительности и качества)
-        if len(button_text) > 35:
-            button_text = button_text[:32] + "..."
-
-        # Добавляем длительность и качество
-        button_text += f" | ⏱️ {duration}"
-        if quality != 'N/A':
-            button_text += f" | 🎧 {quality}"
-
-        track_id = track.get('id', i)
-        # Используем :: как разделитель чтобы избежать конфликта с _ в source названиях
-        callback_data = f"download::{source}::{track_id}"
-
-        builder.row(
-            InlineKeyboardButton(text=button_text, callback_data=callback_data)
-        )
+    # Токен запроса получаем при каждом вызове, чтобы не протух, пока клавиатура в кэше
+    q_token = _query_token(query)
+    fingerprint = tuple(_track_fingerprint(i, track) for i, track in enumerate(tracks))
+    return _build_search_results_keyboard(fingerprint, page, total_pages, source, q_token)
+
+# При листании назад/вперед одни и те же страницы рендерятся повторно
+@functools.lru_cache(maxsize=128)
+def _build_search_results_keyboard(fingerprint, page, total_pages, source, q_token):
+    """Строит клавиатуру результатов поиска по полям треков страницы"""
+    # Используем :: как разделитель чтобы избежать конфликта с _ в source названиях
+    cb_prefix = f"download::{source}::"
+
+    # Добавляем кнопки для каждого трека, по одной в ряд
+    rows = [[_make_track_button(i, fields, cb_prefix)] for i, fields in enumerate(fingerprint)]
     
     # Навигационные кнопки
     nav_buttons = []
+    nav_prefix = f"page::{source}::"
     
     # Кнопка "Назад" (если не первая страница)
     if page > 0:
         nav_buttons.append(
-            InlineKeyboardButton(text="◀️ Назад", callback_data=f"page::{source}::{page-1}::{query}")
-        )
-
-    # Индикатор страницы
-    if total_pages > 1:
-        nav_buttons.append(
-            InlineKeyboardButton(text=f"Стр. {page+1}/{total_pages}", callback_data="noop")
+            InlineKeyboardButton(text="◀️ Назад", callback_data=f"{nav_prefix}{page-1}::{q_token}")
         )
 
     # Кнопка "Вперед" (если не последняя страница)
     if page < total_pages - 1:
         nav_buttons.append(
-            InlineKeyboardButton(text="Вперед ▶️", callback_data=f"page::{source}::{page+1}::{query}")
+            InlineKeyboardButton(text="Вперед ▶️", callback_data=f"{nav_prefix}{page+1}::{q_token}")
         )
     
     if nav_buttons:
-        builder.row(*nav_buttons)
+        rows.append(nav_buttons)
     
     # Кнопка "Новый поиск"
-    builder.row(
-        InlineKeyboardButton(text="🔍 Новый поиск", callback_data="new_search")
-    )
+    rows.append([InlineKeyboardButton(text="🔍 Новый поиск", callback_data="new_search")])
     
-    return builder.as_markup()
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+_START_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🎵 Начать поиск", callback_data="start_search")]
+])
 
 def get_start_keyboard():
-    """Создает клавиатуру для команды /start"""
-    builder = InlineKeyboardBuilder()
-    
-    builder.row(
-        InlineKeyboardButton(text="🎵 Начать поиск", callback_data="start_search")
-    )
-    
-    return builder.as_markup()
+    """Возвращает клавиатуру для команды /start"""
+    return _START_KEYBOARD
+
+_PROGRESS_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="❌ Отменить", callback_data="cancel_download")]
+])
 
 def get_progress_keyboard():
-    """Создает клавиатуру с кнопкой отмены для процесса скачивания"""
-    builder = InlineKeyboardBuilder()
-    
-    builder.row(
-        InlineKeyboardButton(text="❌ Отменить", callback_data="cancel_download")
-    )
-    
-    return builder.as_markup()
+    """Возвращает клавиатуру с кнопкой отмены для процесса скачивания"""
+    return _PROGRESS_KEYBOARD
 
-def get_error_keyboard():
-    """Создает клавиатуру для сообщений об ошибках"""
-    builder = InlineKeyboardBuilder()
-    
-    builder.row(
+_ERROR_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [
         InlineKeyboardButton(text="🔍 Попробовать снова", callback_data="new_search"),
         InlineKeyboardButton(text="🆘 Помощь", callback_data="help")
-    )
-    
-    return builder.as_markup()
+    ]
+])
+
+def get_error_keyboard():
+    """Возвращает клавиатуру для сообщений об ошибках"""
+    return _ERROR_KEYBOARD
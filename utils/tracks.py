@@ -0,0 +1,10 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def dedup_tracks(tracks: Iterable[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Убирает пустые результаты форматирования и дубликаты по 'id', сохраняя порядок первого вхождения"""
+    unique_tracks = {}
+    for track in tracks:
+        if track:
+            unique_tracks.setdefault(track['id'], track)
+    return list(unique_tracks.values())